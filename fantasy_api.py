@@ -1,71 +1,447 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.responses import JSONResponse, StreamingResponse
 from espn_api.basketball import League
 import os
-import requests
+import asyncio
+import logging
+import httpx
+import redis.asyncio as redis
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import time
-import json
+import functools
+import hashlib
+import math
+import sys
+import threading
+import anyio
+import numpy as np
+import orjson
 
 # --- Setup ---
 
 load_dotenv()   # reads .env file if present
 
-from fastapi.openapi.utils import get_openapi
+logger = logging.getLogger(__name__)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, which also handles numpy values.
+    Endpoints returning whole rosters construct it directly so FastAPI skips
+    its jsonable_encoder walk over the payload.
+    """
+
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # ESPN is reached in the background so uvicorn is serving (and /healthz
+    # answering) before the first League fetch finishes.
+    startup = asyncio.create_task(_start_league())
+    discord = asyncio.create_task(_discord_worker())
+    yield
+    startup.cancel()
+    discord.cancel()
+    await _discord.aclose()
+    if _redis is not None:
+        await _redis.aclose()
+
 
 app = FastAPI(
     title="ESPN Fantasy Basketball API",
     description="API for accessing ESPN fantasy basketball league data.",
-    version="1.0.0"
+    version="1.0.0",
+    # Server URL for ChatGPT Actions
+    servers=[{"url": "https://hooping-api.onrender.com"}],
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+    # /openapi.json and /docs are served from pre-encoded bytes at the bottom
+    openapi_url=None,
 )
 
-# Custom OpenAPI schema for ChatGPT Actions
-def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-    openapi_schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
-    openapi_schema["servers"] = [{"url": "https://hooping-api.onrender.com"}]
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
-
-app.openapi = custom_openapi
+# Roster payloads repeat the same keys for every player and compress ~10x
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Load cookies from environment variables
 LEAGUE_ID = 1035166756
 YEAR = 2026
 ESPN_S2 = os.getenv("ESPN_S2")
 SWID = os.getenv("ESPN_SWID")
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
+
+# espn_api player.stats keys
+PROJ_KEY = f"{YEAR}_projected"
+STAT_AVG = "avg"
+STAT_TOTAL = "total"
+
+# League object, created by _start_league() once the app is up
+league = None
+_league_ready = asyncio.Event()   # set once league is loaded
+LEAGUE_WAIT = 30   # seconds a request waits for the first load before a 503
+
+
+# --- League Snapshot Cache ---
+
+# Seconds a snapshot is served before ESPN is hit again. SNAPSHOT_TTL
+# applies on days with games; otherwise (off days, offseason) the longer
+# SNAPSHOT_IDLE_TTL does. A background task refreshes WARM_MARGIN seconds
+# before expiry so requests don't wait on ESPN.
+SNAPSHOT_TTL = float(os.getenv("SNAPSHOT_TTL", "60"))
+SNAPSHOT_IDLE_TTL = float(os.getenv("SNAPSHOT_IDLE_TTL", "900"))
+WARM_MARGIN = 10
+REFRESH_RETRY = 30   # after a failed refresh, keep serving the old snapshot this long
+
+_snapshot = {"ts": 0, "data": None}
+_snapshot_lock = threading.Lock()
+_refresh_task = None   # in-flight refresh shared by concurrent requests
+
+
+def _serialize_player(player):
+    """
+    Copy the player fields the endpoints read out of the espn_api object.
+    Repeated strings are interned so every snapshot shares one copy, and
+    roster comparisons in /changes mostly hit the identity fast path.
+    """
+    return {
+        "name": sys.intern(player.name),
+        "position": sys.intern(player.position),
+        "pro_team": sys.intern(player.proTeam),
+        "injury_status": player.injuryStatus,
+        "stats": getattr(player, "stats", {}) or {},
+        "schedule": getattr(player, "schedule", {}) or {},
+        "projected_avg_points": getattr(player, "projected_avg_points", None),
+        "projected_total_points": getattr(player, "projected_total_points", None),
+    }
+
+
+def _serialize_team(team):
+    roster = tuple(_serialize_player(p) for p in team.roster)
+    return {
+        "id": team.team_id,
+        "name": sys.intern(team.team_name),
+        "wins": team.wins,
+        "losses": team.losses,
+        "roster": roster,
+        "roster_names": tuple(sorted(p["name"] for p in roster)),   # for /changes
+    }
+
+
+# Stat columns carried in the snapshot's struct-of-arrays player table
+STAT_KEYS = ("PTS", "REB", "AST", "BLK", "STL", "FPTS")
+STAT_GROUPS = ("avg", "total", "proj_avg", "proj_total")
+SEASON_GAMES = 82
+
+
+_EMPTY = {}   # shared fallback for missing stat dicts; never mutated
+_LEGACY_PROJ = {STAT_AVG: "projected_avg", STAT_TOTAL: "projected_total"}
+
 
-# Create League object
-league = League(league_id=LEAGUE_ID, year=YEAR, espn_s2=ESPN_S2, swid=SWID)
+def _proj_stats(stats, kind):
+    """Projected avg/total stats: this season's ESPN projection, else the legacy key."""
+    season = stats.get(PROJ_KEY)
+    return (season.get(kind) if season else None) or stats.get(_LEGACY_PROJ[kind]) or _EMPTY
+
+
+def _stat_groups(stats):
+    """Resolve a player's avg/total/projected stat dicts, with ESPN fallbacks."""
+    return {
+        "avg": stats.get(STAT_AVG) or _EMPTY,
+        "total": stats.get(STAT_TOTAL) or _EMPTY,
+        "proj_avg": _proj_stats(stats, STAT_AVG),
+        "proj_total": _proj_stats(stats, STAT_TOTAL),
+    }
+
+
+def _build_columns(players):
+    """
+    One (n_players, len(STAT_KEYS)) float64 matrix per stat group plus the
+    ESPN fantasy point columns. Each is a single np.array() call over plain
+    lists; None becomes NaN, so missing values can still be told apart from
+    a real 0.
+    """
+    groups = [_stat_groups(p["stats"]) for p in players]
+    columns = {
+        g: np.array(
+            [[values[g].get(k) for k in STAT_KEYS] for values in groups],
+            dtype=np.float64,
+        ).reshape(len(players), len(STAT_KEYS))
+        for g in STAT_GROUPS
+    }
+    for k in ("projected_avg_points", "projected_total_points"):
+        columns[k] = np.array([p[k] for p in players], dtype=np.float64)
+
+    # Per-game fantasy points only change when ESPN data does, so derive
+    # them here; requests just multiply by games_this_week.
+    proj_avg_pts = np.nan_to_num(columns["projected_avg_points"])
+    proj_total_pts = np.nan_to_num(columns["projected_total_points"])
+    columns["per_game_fp"] = np.where(
+        proj_avg_pts != 0, proj_avg_pts, proj_total_pts / SEASON_GAMES
+    )
+    return columns
+
+
+def _membership_matrix(team_slices, n_players):
+    membership = np.zeros((len(team_slices), n_players))
+    for t, (start, end) in enumerate(team_slices):
+        membership[t, start:end] = 1.0
+    return membership
+
+
+def _digest(body):
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _game_index(players):
+    """
+    Every scheduled game league-wide, sorted by time, and the player index
+    it belongs to. Sorted so a week is one searchsorted range.
+    """
+    times = np.array(
+        [g["date"] for p in players for g in p["schedule"].values() if g.get("date")],
+        dtype="datetime64[us]",
+    )
+    owner = np.array(
+        [i for i, p in enumerate(players) for g in p["schedule"].values() if g.get("date")],
+        dtype=np.intp,
+    )
+    order = np.argsort(times, kind="stable")
+    return {"game_times": times[order], "game_owner": owner[order]}
+
+
+def _build_snapshot(teams):
+    """Freeze teams + rosters and lay the players out as columns."""
+    teams = tuple(_serialize_team(t) for t in teams)
+    players = []
+    team_slices = []   # (start, end) into players, by team index; names need not be unique
+    for team in teams:
+        start = len(players)
+        players.extend(team["roster"])
+        team_slices.append((start, len(players)))
+    snapshot = {
+        "teams": teams,
+        "players": tuple(players),
+        "columns": _build_columns(players),
+        "team_slices": tuple(team_slices),
+        **_game_index(players),
+        "game_days": frozenset(
+            g["date"].date() for p in players for g in p["schedule"].values() if g.get("date")
+        ),
+        "etag": _digest(orjson.dumps(teams, option=orjson.OPT_NON_STR_KEYS)),
+        # (n_teams, n_players) 0/1 matrix: membership @ column sums per team
+        "membership": _membership_matrix(team_slices, len(players)),
+        "week_cache": {},   # see _week_rollups()
+        # Fingerprint of every roster; /changes skips the diff when it matches
+        "roster_sig": _digest(orjson.dumps({t["name"]: t["roster_names"] for t in teams})),
+        # /teams only changes with the snapshot, so it is encoded once here
+        "teams_json": orjson.dumps([
+            {"id": t["id"], "name": t["name"], "wins": t["wins"], "losses": t["losses"]}
+            for t in teams
+        ]),
+    }
+    snapshot["teams_etag"] = _digest(snapshot["teams_json"])
+    return snapshot
+
+
+def snapshot_ttl():
+    """SNAPSHOT_TTL on game days, SNAPSHOT_IDLE_TTL when nobody plays today."""
+    snap = _snapshot["data"]
+    if snap is None or datetime.today().date() in snap["game_days"]:
+        return SNAPSHOT_TTL
+    return SNAPSHOT_IDLE_TTL
+
+
+def _is_fresh(max_age):
+    return _snapshot["data"] is not None and time.monotonic() - _snapshot["ts"] < max_age
+
+
+def get_snapshot(max_age=None):
+    """
+    Return the cached league snapshot, refetching from ESPN once it is older
+    than max_age (default snapshot_ttl()). Blocking; async code goes through
+    ensure_fresh(). If ESPN fails, the previous snapshot is served and the
+    fetch is retried after REFRESH_RETRY seconds.
+    """
+    if max_age is None:
+        max_age = snapshot_ttl()
+    with _snapshot_lock:
+        if _is_fresh(max_age):
+            return _snapshot["data"]
+        try:
+            league.fetch_league()
+            data = _build_snapshot(league.teams)
+        except Exception:
+            if _snapshot["data"] is None:
+                raise
+            logger.exception("ESPN refresh failed, serving the previous snapshot")
+            # Age the old snapshot so it expires again in REFRESH_RETRY seconds
+            _snapshot["ts"] = time.monotonic() - max(snapshot_ttl() - REFRESH_RETRY, 0)
+            return _snapshot["data"]
+        _snapshot.update(ts=time.monotonic(), data=data)
+        return data
+
+
+async def _refresh(max_age):
+    global _refresh_task
+    try:
+        return await anyio.to_thread.run_sync(get_snapshot, max_age)
+    finally:
+        _refresh_task = None
+
+
+async def ensure_fresh(max_age=None):
+    """
+    Snapshot accessor for endpoints. A fresh snapshot is returned without
+    leaving the event loop; when stale, every concurrent caller awaits the
+    same refresh, so N requests cost one ESPN fetch.
+    """
+    global _refresh_task
+    if max_age is None:
+        max_age = snapshot_ttl()
+    if _is_fresh(max_age):
+        return _snapshot["data"]
+    if league is None:
+        await _wait_for_league()
+        if _is_fresh(max_age):
+            return _snapshot["data"]
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh(max_age))
+    # shield: a client disconnecting shouldn't cancel everyone else's refresh
+    return await asyncio.shield(_refresh_task)
+
+
+async def _wait_for_league():
+    """Block a request until the first League load, up to LEAGUE_WAIT seconds."""
+    try:
+        await asyncio.wait_for(_league_ready.wait(), LEAGUE_WAIT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="League data is still loading, try again shortly.")
+
+
+def _connect_league():
+    """Create the League (its constructor fetches everything) and seed the snapshot."""
+    global league
+    new_league = League(league_id=LEAGUE_ID, year=YEAR, espn_s2=ESPN_S2, swid=SWID)
+    data = _build_snapshot(new_league.teams)
+    with _snapshot_lock:
+        league = new_league
+        _snapshot.update(ts=time.monotonic(), data=data)
+
+
+async def _start_league():
+    """Connect to ESPN with exponential backoff, then keep the snapshot warm."""
+    attempt = 0
+    while league is None:
+        try:
+            await anyio.to_thread.run_sync(_connect_league)
+            # Set here on the event loop; _connect_league runs in a worker thread
+            _league_ready.set()
+        except Exception:
+            delay = min(2 ** attempt, 60)
+            logger.exception("League init failed, retrying in %ss", delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+    await _keep_warm()
+
+
+async def _keep_warm():
+    """Background loop started at startup: refresh just before expiry."""
+    while True:
+        ttl = snapshot_ttl()
+        refresh_at = max(ttl - WARM_MARGIN, ttl / 2)
+        try:
+            snap = await ensure_fresh(refresh_at)
+            # Precompute the summary so reads after a refresh are a cache hit
+            _summary_json(snap, _week_rollups(snap, *current_week_bounds()))
+        except Exception:
+            logger.exception("Background snapshot refresh failed")
+            await asyncio.sleep(WARM_MARGIN)
+            continue
+        age = time.monotonic() - _snapshot["ts"]
+        await asyncio.sleep(max(refresh_at - age, 1))
+
+
+def _week_bounds(iso_week):
+    """Monday 00:00 through the end of Sunday for an (ISO year, week) pair."""
+    start_of_week = datetime.fromisocalendar(iso_week[0], iso_week[1], 1)
+    end_of_week = start_of_week + timedelta(days=7) - timedelta(microseconds=1)
+    return start_of_week, end_of_week
+
+
+_week = {"until": 0.0, "bounds": None}   # current week, valid until next Monday
+
+
+def current_week_bounds():
+    """This week's bounds; only recomputed once the week has rolled over."""
+    if time.time() >= _week["until"]:
+        start_of_week, end_of_week = _week_bounds(datetime.today().isocalendar()[:2])
+        _week["bounds"] = (start_of_week, end_of_week)
+        _week["until"] = (start_of_week + timedelta(days=7)).timestamp()
+    return _week["bounds"]
+
+
+def _games_this_week(snap, start_of_week, end_of_week):
+    """games_this_week for every snapshot player, as a float64 vector."""
+    times = snap["game_times"]
+    lo = np.searchsorted(times, np.datetime64(start_of_week), side="left")
+    hi = np.searchsorted(times, np.datetime64(end_of_week), side="right")
+    counts = np.bincount(snap["game_owner"][lo:hi], minlength=len(snap["players"]))
+    return counts.astype(np.float64)
+
+
+def _etag_matches(request, etag):
+    """True if the client's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in header.split(","))
+
+
+def _cache_headers(etag):
+    return {"ETag": f'"{etag}"', "Cache-Control": f"public, max-age={int(SNAPSHOT_TTL)}"}
+
+
+def _json_or_304(request, body, etag):
+    """Pre-encoded JSON body, or a bodiless 304 if the client already has it."""
+    headers = _cache_headers(etag)
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _opt(value):
+    """NaN column entries go back out as null."""
+    return None if math.isnan(value) else value
 
 
 # --- Basic Endpoints ---
 
 @app.get("/teams")
-def teams():
-    """Return basic team info."""
-    result = []
-    for t in league.teams:
-        result.append({
-            "id": t.team_id,
-            "name": t.team_name,
-            "wins": t.wins,
-            "losses": t.losses
-        })
-    return result
+async def teams(request: Request):
+    """Return basic team info. Supports If-None-Match like /rosters_detailed."""
+    snap = await ensure_fresh()
+    return _json_or_304(request, snap["teams_json"], snap["teams_etag"])
+
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness check; answers before the League has loaded."""
+    return {"status": "ok", "league_loaded": league is not None}
 
 
 @app.get("/transactions")
-def transactions(size: int = 10):
+async def transactions(size: int = 10):
     """Return recent league transactions."""
+    if league is None:
+        await _wait_for_league()
     try:
-        acts = league.recent_activity(size=size)
+        acts = await anyio.to_thread.run_sync(functools.partial(league.recent_activity, size=size))
         updates = []
         for act in acts:
             for a in act.actions:
@@ -81,18 +457,19 @@ def transactions(size: int = 10):
 
 
 @app.get("/rosters")
-def rosters():
+async def rosters():
     """Return full rosters for all teams with player stats."""
+    snap = await ensure_fresh()
     result = []
-    for team in league.teams:
+    for team in snap["teams"]:
         roster = []
-        for player in team.roster:
-            stats = player.stats.get('avg', {}) if hasattr(player, 'stats') else {}
+        for player in team["roster"]:
+            stats = player["stats"].get(STAT_AVG) or _EMPTY
             roster.append({
-                "name": player.name,
-                "position": player.position,
-                "pro_team": player.proTeam,
-                "injury_status": player.injuryStatus,
+                "name": player["name"],
+                "position": player["position"],
+                "pro_team": player["pro_team"],
+                "injury_status": player["injury_status"],
                 "points_avg": stats.get("PTS"),
                 "rebounds_avg": stats.get("REB"),
                 "assists_avg": stats.get("AST"),
@@ -100,179 +477,426 @@ def rosters():
                 "steals_avg": stats.get("STL")
             })
         result.append({
-            "team": team.team_name,
+            "team": team["name"],
             "roster": roster
         })
-    return result
+    return ORJSONResponse(result)
 
 
 # --- Roster Changes (Discord Integration) ---
 
-last_snapshot = {}
+DISCORD_MAX_EMBEDS = 10       # Discord's per-message embed limit
+DISCORD_MAX_CHARS = 6000      # ...and total title + description characters per message
+DISCORD_MAX_DESCRIPTION = 4096
+DISCORD_MIN_INTERVAL = 0.2    # seconds between posts (5/s) to stay clear of 429s
+DISCORD_DEDUP_WINDOW = 30     # identical payloads within this many seconds are dropped
+
+# The worker posts one message at a time, so a single HTTP/2 connection is
+# all it needs; keep it open across bursts rather than re-handshaking.
+_discord = httpx.AsyncClient(
+    http2=True,
+    timeout=5,
+    limits=httpx.Limits(max_connections=1, keepalive_expiry=60),
+)
+_discord_queue = asyncio.Queue()
+_sent_hashes = {}   # payload digest -> monotonic time it was queued
+
+
+def _change_embed(team, added, removed):
+    lines = []
+    if added:
+        lines.append(f"➕ Added: {', '.join(added)}")
+    if removed:
+        lines.append(f"➖ Dropped: {', '.join(removed)}")
+    description = "\n".join(lines)
+    if len(description) > DISCORD_MAX_DESCRIPTION:
+        description = description[:DISCORD_MAX_DESCRIPTION - 1] + "…"
+    return {"title": f"🏀 {team} roster changes", "description": description}
+
+
+def _embed_batches(embeds):
+    """Pack embeds into as few messages as Discord's count and size limits allow."""
+    batch, size = [], 0
+    for embed in embeds:
+        n = len(embed["title"]) + len(embed["description"])
+        if batch and (len(batch) == DISCORD_MAX_EMBEDS or size + n > DISCORD_MAX_CHARS):
+            yield batch
+            batch, size = [], 0
+        batch.append(embed)
+        size += n
+    if batch:
+        yield batch
+
+
+def _queue_embeds(embeds):
+    """
+    Queue change embeds for Discord in as few messages as it allows,
+    skipping any message already queued within DISCORD_DEDUP_WINDOW.
+    """
+    now = time.monotonic()
+    for digest, queued_at in list(_sent_hashes.items()):
+        if now - queued_at >= DISCORD_DEDUP_WINDOW:
+            del _sent_hashes[digest]
+
+    for batch in _embed_batches(embeds):
+        payload = {"embeds": batch}
+        digest = hashlib.blake2b(orjson.dumps(payload), digest_size=16).hexdigest()
+        if digest in _sent_hashes:
+            continue
+        _sent_hashes[digest] = now
+        _discord_queue.put_nowait(payload)
+
+
+async def _discord_worker():
+    """Single consumer for _discord_queue, posting at most every DISCORD_MIN_INTERVAL."""
+    last_sent = 0.0
+    while True:
+        payload = await _discord_queue.get()
+        await asyncio.sleep(max(0.0, DISCORD_MIN_INTERVAL - (time.monotonic() - last_sent)))
+        try:
+            resp = await _discord.post(DISCORD_WEBHOOK_URL, json=payload)
+            resp.raise_for_status()
+        except Exception:
+            # Anything (a bad webhook URL raises InvalidURL, not HTTPError)
+            # must not kill the only consumer
+            logger.exception("Discord webhook post failed")
+        last_sent = time.monotonic()
+
+
+# Previous rosters live in Redis when REDIS_URL is set, so /changes keeps its
+# history across restarts and is shared between workers. Without it we fall
+# back to this process's memory.
+REDIS_URL = os.getenv("REDIS_URL")
+ROSTERS_KEY = f"snap:{LEAGUE_ID}"
+ROSTERS_TTL = 86400
+
+_redis = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+last_snapshot = {}   # team name -> sorted tuple of player names
+last_snapshot_sig = None
+
+
+async def _load_last_snapshot(sig):
+    """Previous rosters, or None when they were saved under the same signature."""
+    if _redis is None:
+        return None if sig == last_snapshot_sig else last_snapshot
+    async with _redis.pipeline(transaction=False) as pipe:
+        pipe.get(f"{ROSTERS_KEY}:sig")
+        pipe.expire(ROSTERS_KEY, ROSTERS_TTL)
+        pipe.expire(f"{ROSTERS_KEY}:sig", ROSTERS_TTL)
+        stored_sig, _, _ = await pipe.execute()
+    if stored_sig is not None and stored_sig.decode() == sig:
+        return None
+    raw = await _redis.get(ROSTERS_KEY)
+    if not raw:
+        return {}
+    return {team: tuple(names) for team, names in orjson.loads(raw).items()}
+
+
+async def _save_last_snapshot(current, sig):
+    global last_snapshot, last_snapshot_sig
+    if _redis is None:
+        last_snapshot, last_snapshot_sig = current, sig
+        return
+    async with _redis.pipeline(transaction=False) as pipe:
+        pipe.set(ROSTERS_KEY, orjson.dumps(current), ex=ROSTERS_TTL)
+        pipe.set(f"{ROSTERS_KEY}:sig", sig, ex=ROSTERS_TTL)
+        await pipe.execute()
+
+
+def _sorted_diff(old, new):
+    """Added/removed names between two sorted tuples, in one linear merge."""
+    added, removed = [], []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            removed.append(old[i])
+            i += 1
+        else:
+            added.append(new[j])
+            j += 1
+    removed.extend(old[i:])
+    added.extend(new[j:])
+    return added, removed
+
+
+def _diff_rosters(previous, current):
+    changes = {}
+    if previous:
+        for team, players in current.items():
+            old = previous.get(team, ())
+            # Unchanged roster (the usual case): the same snapshot's tuple, or
+            # an equal one, means nothing to merge
+            if old is players or old == players:
+                continue
+            added, removed = _sorted_diff(old, players)
+            if added or removed:
+                changes[team] = {"added": added, "removed": removed}
+    return changes
+
 
 @app.get("/changes")
-def changes():
+async def changes():
     """Check for adds/drops and post to Discord if any changes are found."""
-    global last_snapshot
-    webhook = os.getenv("DISCORD_WEBHOOK_URL")
-    current = {t.team_name: [p.name for p in t.roster] for t in league.teams}
+    snap = await ensure_fresh()
+    current = {t["name"]: t["roster_names"] for t in snap["teams"]}
     changes = {}
 
-    if last_snapshot:
-        for team, players in current.items():
-            old_players = last_snapshot.get(team, [])
-            added = list(set(players) - set(old_players))
-            removed = list(set(old_players) - set(players))
-            if added or removed:
-                changes[team] = {"added": added, "removed": removed}
+    # Only one worker may diff + save at a time, or both would post the same changes
+    lock = _redis.lock(f"{ROSTERS_KEY}:lock", timeout=30) if _redis else None
+    if lock is not None and not await lock.acquire(blocking=False):
+        return {"timestamp": time.time(), "changes": changes, "skipped": "another /changes run is in progress"}
 
-                if webhook:
-                    msg = f"🏀 **{team}** roster changes:\n"
-                    if added:
-                        msg += f"➕ Added: {', '.join(added)}\n"
-                    if removed:
-                        msg += f"➖ Dropped: {', '.join(removed)}"
-                    requests.post(webhook, json={"content": msg})
+    try:
+        previous = await _load_last_snapshot(snap["roster_sig"])
+        if previous is not None:
+            changes = _diff_rosters(previous, current)
+            await _save_last_snapshot(current, snap["roster_sig"])
+    finally:
+        if lock is not None:
+            await lock.release()
+
+    if DISCORD_WEBHOOK_URL and changes:
+        embeds = [_change_embed(team, c["added"], c["removed"]) for team, c in changes.items()]
+        _queue_embeds(embeds)
 
-    last_snapshot = current
     return {"timestamp": time.time(), "changes": changes}
 
 
 # --- Detailed Roster Data (Core Endpoint) ---
 
-@app.get("/rosters_detailed")
-def rosters_detailed():
+@dataclass(slots=True)
+class PlayerRow:
+    name: str
+    position: str
+    pro_team: str
+    injury_status: str
+    games_this_week: int
+    projection_source: str
+
+    # Core stats
+    avg_points: float | None
+    avg_rebounds: float | None
+    avg_assists: float | None
+    avg_blocks: float | None
+    avg_steals: float | None
+    avg_fantasy_points: float | None
+    total_points: float | None
+    total_rebounds: float | None
+    total_assists: float | None
+    total_blocks: float | None
+    total_steals: float | None
+
+    # ESPN Projections
+    projected_avg_fantasy_points: float | None
+    projected_total_fantasy_points: float | None
+    projected_weekly_fantasy_points: float
+
+
+@dataclass(slots=True)
+class TeamRow:
+    team: str
+    projection_source: str
+    season_totals: dict
+    projected_weekly_totals: dict
+    roster: list
+
+
+def _build_player_row(
+    player: dict,
+    games_this_week: int,
+    avg: list[float],
+    total: list[float],
+    proj_avg_points: float,
+    proj_total_points: float,
+    weekly_fp: float,
+) -> PlayerRow:
     """
-    Player + team details with correct weekly projections.
-    weekly = ESPN projected average * games_this_week.
-    Includes per-category and fantasy point summaries.
+    One /rosters_detailed row from a player's snapshot values (NaN = missing).
+    avg and total are matrix rows in STAT_KEYS order, which is also the order
+    of PlayerRow's stat fields, so they are passed positionally.
     """
-    result = []
-    today = datetime.today()
-    start_of_week = today - timedelta(days=today.weekday())   # Monday
-    end_of_week = start_of_week + timedelta(days=6)           # Sunday
-
-    for team in league.teams:
-        roster_data = []
-        team_projected_weekly = {"PTS": 0, "REB": 0, "AST": 0, "BLK": 0, "STL": 0, "FPTS": 0}
-        team_season_total = {"PTS": 0, "REB": 0, "AST": 0, "BLK": 0, "STL": 0, "FPTS": 0}
-
-        for player in team.roster:
-            avg_stats = player.stats.get("avg", {})
-            total_stats = player.stats.get("total", {})
-
-            proj_total = (
-                player.stats.get(f"{YEAR}_projected", {}).get("total", {})
-                or player.stats.get("projected_total", {})
-                or {}
-            )
-            proj_avg = (
-                player.stats.get(f"{YEAR}_projected", {}).get("avg", {})
-                or player.stats.get("projected_avg", {})
-                or {}
-            )
-
-            games_this_week = sum(
-                1 for g in getattr(player, "schedule", {}).values()
-                if g.get("date") and start_of_week <= g["date"] <= end_of_week
-            )
-
-            # ESPN-sourced projections
-            projected_total_points = getattr(player, "projected_total_points", None)
-            projected_avg_points = getattr(player, "projected_avg_points", None)
-
-            per_game_fp = projected_avg_points or (
-                (projected_total_points / 82) if projected_total_points else 0
-            )
-            projected_weekly_fp = per_game_fp * games_this_week
-
-            player_info = {
-                "name": player.name,
-                "position": player.position,
-                "pro_team": player.proTeam,
-                "injury_status": player.injuryStatus,
-                "games_this_week": games_this_week,
-                "projection_source": "ESPN",
+    return PlayerRow(
+        player["name"],
+        player["position"],
+        player["pro_team"],
+        player["injury_status"],
+        games_this_week,
+        "ESPN",
+        *[_opt(v) for v in avg],
+        *[_opt(v) for v in total[:5]],   # no season FPTS total in the row
+        _opt(proj_avg_points),
+        _opt(proj_total_points),
+        round(weekly_fp, 2),
+    )
 
-                # Core stats
-                "avg_points": avg_stats.get("PTS"),
-                "avg_rebounds": avg_stats.get("REB"),
-                "avg_assists": avg_stats.get("AST"),
-                "avg_blocks": avg_stats.get("BLK"),
-                "avg_steals": avg_stats.get("STL"),
-                "avg_fantasy_points": avg_stats.get("FPTS"),
-                "total_points": total_stats.get("PTS"),
-                "total_rebounds": total_stats.get("REB"),
-                "total_assists": total_stats.get("AST"),
-                "total_blocks": total_stats.get("BLK"),
-                "total_steals": total_stats.get("STL"),
-
-                # ESPN Projections
-                "projected_avg_fantasy_points": projected_avg_points,
-                "projected_total_fantasy_points": projected_total_points,
-                "projected_weekly_fantasy_points": round(projected_weekly_fp, 2),
-            }
 
-            roster_data.append(player_info)
+def _aggregate_teams(membership, cols, games, weekly_fp):
+    """
+    Every team's totals in one matrix product per quantity rather than a
+    Python loop of per-team slice sums. Returns plain lists of rows, one per
+    team and already rounded to 2 places: season stat totals, games-weighted
+    projected stats with weekly FPTS, and the same with the summary's weekly
+    FPTS (projected average only).
+    """
+    fpts = STAT_KEYS.index("FPTS")
+    season = membership @ np.nan_to_num(cols["total"])
+    weekly = membership @ (np.nan_to_num(cols["proj_avg"]) * games[:, None])
+    weekly[:, fpts] = membership @ weekly_fp
+    summary = weekly.copy()
+    summary[:, fpts] = membership @ (np.nan_to_num(cols["projected_avg_points"]) * games)
+    return tuple(np.round(m, 2).tolist() for m in (season, weekly, summary))
 
-            # Team-level aggregation
-            if projected_weekly_fp:
-                team_projected_weekly["FPTS"] += projected_weekly_fp
-            for stat in ["PTS", "REB", "AST", "BLK", "STL"]:
-                team_projected_weekly[stat] += proj_avg.get(stat, 0) * games_this_week
-                team_season_total[stat] += total_stats.get(stat, 0) or 0
 
-        result.append({
-            "team": team.team_name,
-            "projection_source": "ESPN",
-            "season_totals": {k: round(v, 2) for k, v in team_season_total.items()},
-            "projected_weekly_totals": {k: round(v, 2) for k, v in team_projected_weekly.items()},
-            "roster": roster_data
+def _week_rollups(snap, start_of_week, end_of_week):
+    """
+    games_this_week and per-team totals for the snapshot, computed once per
+    (snapshot, week) and shared by /rosters_detailed and /rosters_summary,
+    along with each team's encoded /rosters_detailed entry once built.
+    Only the current week is kept.
+    """
+    key = start_of_week.date()
+    cached = snap["week_cache"].get(key)
+    if cached is not None:
+        return cached
+
+    cols = snap["columns"]
+    games = _games_this_week(snap, start_of_week, end_of_week)
+    weekly_fp = cols["per_game_fp"] * games
+    totals = _aggregate_teams(snap["membership"], cols, games, weekly_fp)
+
+    teams = []   # by team index, like snap["teams"]
+    for season, weekly, summary in zip(*totals):
+        season_totals = dict(zip(STAT_KEYS, season))
+        season_totals["FPTS"] = 0   # only the five categories roll up for the season
+        teams.append({
+            "season_totals": season_totals,
+            "projected_weekly_totals": dict(zip(STAT_KEYS, weekly)),
+            # The summary has never used the /82 fallback for FPTS
+            "summary_weekly_totals": dict(zip(STAT_KEYS, summary)),
         })
 
-    return result
+    cached = {"games": games, "weekly_fp": weekly_fp, "teams": teams, "encoded_teams": {}}
+    snap["week_cache"] = {key: cached}
+    return cached
+
+
+def _team_row(snap, i, week):
+    """Team i's /rosters_detailed entry from the snapshot columns."""
+    team = snap["teams"][i]
+    start, end = snap["team_slices"][i]
+    cols = snap["columns"]
+    totals = week["teams"][i]
+
+    roster_data = [
+        _build_player_row(*values)
+        for values in zip(
+            snap["players"][start:end],
+            week["games"][start:end].astype(int).tolist(),
+            cols["avg"][start:end].tolist(),
+            cols["total"][start:end].tolist(),
+            # ESPN-sourced projections
+            cols["projected_avg_points"][start:end].tolist(),
+            cols["projected_total_points"][start:end].tolist(),
+            week["weekly_fp"][start:end].tolist(),
+        )
+    ]
+    return TeamRow(
+        team=team["name"],
+        projection_source="ESPN",
+        season_totals=totals["season_totals"],
+        projected_weekly_totals=totals["projected_weekly_totals"],
+        roster=roster_data,
+    )
+
+
+@app.get("/rosters_detailed")
+async def rosters_detailed(request: Request):
+    """
+    Player + team details with correct weekly projections.
+    weekly = ESPN projected average * games_this_week.
+    Includes per-category and fantasy point summaries.
+    Supports If-None-Match; unchanged data comes back as a bodiless 304.
+    """
+    start_of_week, end_of_week = current_week_bounds()
+    snap = await ensure_fresh()
+
+    # Payload only changes with the snapshot or the week
+    headers = _cache_headers(f'{snap["etag"]}-{start_of_week:%Y%m%d}')
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    week = _week_rollups(snap, start_of_week, end_of_week)
+    # Encoded rows live as long as the week rollups, so later requests for
+    # the same snapshot and week skip straight to writing bytes
+    encoded = week["encoded_teams"]
+
+    # Stream one team at a time: clients can start parsing before the last
+    # team is encoded. Separators ride along with each team so every send
+    # (and GZip flush) carries a whole team.
+    async def body():
+        sep = b"["
+        for i in range(len(snap["teams"])):
+            chunk = encoded.get(i)
+            if chunk is None:
+                chunk = encoded[i] = orjson.dumps(_team_row(snap, i, week))
+            yield sep + chunk
+            sep = b","
+        yield b"]" if sep == b"," else b"[]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
 
 
 # --- Summary Endpoint ---
 
+def _summary_json(snap, week):
+    """Encoded /rosters_summary body and its ETag, built once per (snapshot, week)."""
+    if "summary_json" not in week:
+        summary = [
+            {
+                "team": team["name"],
+                "projection_source": "ESPN",
+                "projected_weekly_totals": totals["summary_weekly_totals"],
+            }
+            for team, totals in zip(snap["teams"], week["teams"])
+        ]
+        summary.sort(key=lambda x: x["projected_weekly_totals"]["FPTS"], reverse=True)
+        body = orjson.dumps(summary)
+        week["summary_json"] = (body, _digest(body))
+    return week["summary_json"]
+
+
 @app.get("/rosters_summary")
-def rosters_summary():
+async def rosters_summary(request: Request):
     """
     Lightweight summary for team projections.
     Aggregates ESPN-sourced per-game projections and games_this_week.
+    Supports If-None-Match like /rosters_detailed.
     """
-    today = datetime.today()
-    start_of_week = today - timedelta(days=today.weekday())
-    end_of_week = start_of_week + timedelta(days=6)
-    summary = []
-
-    for team in league.teams:
-        team_weekly = {"PTS": 0, "REB": 0, "AST": 0, "BLK": 0, "STL": 0, "FPTS": 0}
-
-        for player in team.roster:
-            proj_avg = (
-                player.stats.get(f"{YEAR}_projected", {}).get("avg", {})
-                or player.stats.get("projected_avg", {})
-                or {}
-            )
-            games_this_week = sum(
-                1 for g in getattr(player, "schedule", {}).values()
-                if g.get("date") and start_of_week <= g["date"] <= end_of_week
-            )
-
-            projected_avg_points = getattr(player, "projected_avg_points", None)
-            per_game_fp = projected_avg_points or 0
-            projected_weekly_fp = per_game_fp * games_this_week
-
-            for stat in ["PTS", "REB", "AST", "BLK", "STL"]:
-                team_weekly[stat] += (proj_avg.get(stat, 0) or 0) * games_this_week
-            team_weekly["FPTS"] += projected_weekly_fp
-
-        summary.append({
-            "team": team.team_name,
-            "projection_source": "ESPN",
-            "projected_weekly_totals": {k: round(v, 2) for k, v in team_weekly.items()}
-        })
+    snap = await ensure_fresh()
+    week = _week_rollups(snap, *current_week_bounds())
+    return _json_or_304(request, *_summary_json(snap, week))
+
+
+# --- OpenAPI ---
+
+# The route set is fixed once the module has loaded, so build and encode the
+# schema here instead of on every /openapi.json hit.
+_openapi_json = orjson.dumps(app.openapi())
+
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_json():
+    return Response(_openapi_json, media_type="application/json")
+
+
+@app.get("/docs", include_in_schema=False)
+async def docs():
+    return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{app.title} - Swagger UI")
+
 
-    summary.sort(key=lambda x: x["projected_weekly_totals"]["FPTS"], reverse=True)
-    return summary
+@app.get("/redoc", include_in_schema=False)
+async def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title=f"{app.title} - ReDoc")